@@ -1,14 +1,132 @@
 import lzma
-
+import os
+import struct
+import threading
+
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from copy import copy
+from itertools import repeat
 from math import nan
-from statistics import mode
-from typing_extensions import Self
 
-_from_small_bytes = lambda x: int.from_bytes(x, "little")
-_from_big_bytes = lambda x: int.from_bytes(x, "big")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+#300s, 100s, 50s, gekis, katus, misses, score, highest combo, is perfect, mods
+_FIXED_STRUCT = struct.Struct("<HHHHHHIH?I")
+
+#bytes.translate table keeping only the 4 button bits of a frame
+_LOW_NIBBLE = bytes(i & 0xF for i in range(256))
+
+class _Cursor:
+    """
+    Reads fields from a memoryview by moving an offset, so the rest of the file is never copied
+    """
+    __slots__ = ("buf", "off")
+
+    def __init__(self, buf: memoryview, off: int = 0):
+        self.buf = buf
+        self.off = off
+
+    def read(self, length: int) -> memoryview:
+        value = self.buf[self.off:self.off + length]
+        self.off += length
+        return value
+
+    def read_u8(self) -> int:
+        value = self.buf[self.off]
+        self.off += 1
+        return value
+
+    def read_u32(self) -> int:
+        [value] = _U32.unpack_from(self.buf, self.off)
+        self.off += 4
+        return value
+
+    def read_u64(self) -> int:
+        [value] = _U64.unpack_from(self.buf, self.off)
+        self.off += 8
+        return value
+
+    def read_struct(self, fields: struct.Struct) -> tuple:
+        values = fields.unpack_from(self.buf, self.off)
+        self.off += fields.size
+        return values
+
+    def read_str(self, length: int) -> str:
+        return str(self.read(length), "utf-8")
+
+def _read_uleb128(buf: memoryview, off: int) -> tuple[int, int]:
+    """
+    Reads a ULEB128 number starting at off
+
+    Returns the number, and the offset after it
+    """
+    #each byte holds 7 bits of the number, the highest bit is set if another byte follows
+    #lengths in an osr file fit in 4 bytes so those are unrolled
+    b0 = buf[off]
+    if b0 < 0x80:
+        return (b0, off + 1)
+    b1 = buf[off + 1]
+    if b1 < 0x80:
+        return ((b0 & 0x7f) | b1 << 7, off + 2)
+    b2 = buf[off + 2]
+    if b2 < 0x80:
+        return ((b0 & 0x7f) | (b1 & 0x7f) << 7 | b2 << 14, off + 3)
+    b3 = buf[off + 3]
+    if b3 < 0x80:
+        return ((b0 & 0x7f) | (b1 & 0x7f) << 7 | (b2 & 0x7f) << 14 | b3 << 21, off + 4)
+
+    val = (b0 & 0x7f) | (b1 & 0x7f) << 7 | (b2 & 0x7f) << 14 | (b3 & 0x7f) << 21
+    shift = 28
+    off += 4
+    while True:
+        b = buf[off]
+        off += 1
+        val |= (b & 0x7f) << shift
+        if b < 0x80:
+            return (val, off)
+        shift += 7
+
+def _parse_action_stream(buf: bytes) -> tuple[array, array, array, array]:
+    """
+    Parses the decompressed action stream into four parallel arrays: (time delta, x, y, buttons)
+
+    Frames are split and converted with C level str/map calls instead of a python loop per frame
+    """
+    frames = [frame for frame in buf.decode("utf-8").split(",") if frame]
+    if not frames:
+        return (array("q"), array("d"), array("d"), array("l"))
+    #a frame with too few or too many fields would shift every frame after it
+    if set(map(str.count, frames, repeat("|"))) != {3}:
+        raise BadReplayDataException("Malformed replay frame data")
+    fields = "|".join(frames).split("|")
+    return (
+        array("q", map(int, fields[0::4])),
+        array("d", map(float, fields[1::4])),
+        array("d", map(float, fields[2::4])),
+        array("l", map(int, fields[3::4]))
+    )
 
-def _get_data_point(data, length, conversionFn = lambda x: x):
-    return [conversionFn(data[0:length]), data[length:]]
+def _count_edges(mask_bytes: bytes, key: int) -> int:
+    """
+    Counts the runs of frames where key is not held, this is the same as
+    the amount of times key was let go of, plus one if the replay starts with key up
+
+    mask_bytes is the low byte of the buttons of each frame, key must fit in a byte
+    """
+    #every frame becomes either key or 0, a leading key makes a replay that starts with key up count as an edge
+    edge = bytes((key, 0))
+    return (edge[:1] + mask_bytes.translate(bytes(map(key.__and__, range(256))))).count(edge)
+
+#parsed replays keyed by (path, mtime, size), so loading an unchanged file again skips reading and parsing it
+_REPLAY_CACHE: dict[tuple, "Replay"] = {}
+#this limits the number of replays, not memory, every cached replay keeps the whole file (raw_data),
+#a copy of the compressed input frames (replay_data), and once any copy reads its input frames, all 4 parsed columns
+#that is 32 bytes per frame on top of the file, so 128 long replays can hold hundreds of MB until Replay.clear_cache()
+_REPLAY_CACHE_SIZE = 128
+#from_files can load replays from many threads at once
+_REPLAY_CACHE_LOCK = threading.Lock()
 
 class BadReplayDataException(Exception):
     pass
@@ -25,7 +143,7 @@ class LifeGraph:
     def __getitem__(self, item):
         if self.data is None:
             return None
-        if isinstance(item, slice | int):
+        if isinstance(item, (slice, int)):
             return self.data[item]
         elif isinstance(item, tuple):
             return tuple(self[point] for point in item)
@@ -59,9 +177,17 @@ class Replay:
         "replay_data",
         "online_score_id",
         "additional_mod_information",
-        "raw_input_data",
-        "seed",
+        "_ts",
+        "_x",
+        "_y",
+        "_b",
+        "__seed",
         "raw_data",
+        "__raw_input_data",
+        "__mask_hist",
+        "__mask_bytes",
+        "__source",
+        "__load_lock",
         "__total_x",
         "__total_y",
         "__mouse_left",
@@ -96,8 +222,18 @@ class Replay:
         self.replay_data = None
         self.online_score_id = None
         self.additional_mod_information = None
-        self.raw_input_data: tuple | None = None
-        self.seed = None
+        self._ts: array | None = None
+        self._x: array | None = None
+        self._y: array | None = None
+        self._b: array | None = None
+        self.__raw_input_data: tuple | None = None
+        self.__mask_hist: list[int] | None = None
+        self.__mask_bytes: bytes | None = None
+        #the cached replay this is a copy of, the input frames are parsed on it so every copy shares them
+        self.__source: Replay | None = None
+        #only set on cached replays, so copies loading their input frames from different threads parse them once
+        self.__load_lock: threading.Lock | None = None
+        self.__seed = None
         self.__total_x = None
         self.__total_y = None
         self.__mouse_left_frames = None
@@ -116,15 +252,10 @@ class Replay:
         """
         calculates the average position of the mouse
         """
-        if self.raw_input_data is None:
-            return (nan, nan)
-        if self.__total_x is None:
-            self.__total_x = sum(map(lambda x: x[1], self.raw_input_data))
-        if self.__total_y is None:
-            self.__total_y = sum(map(lambda x: x[2], self.raw_input_data))
-        if self.raw_input_data is None:
+        if not self.__load_actions() or not self._x:
             return (nan, nan)
-        return self.__total_x / (len(self.raw_input_data)), self.__total_y / (len(self.raw_input_data) )
+        n = len(self._x)
+        return (self.__total_x / n, self.__total_y / n)
 
     def map_length(self):
         if self.__map_len is not None:
@@ -155,7 +286,24 @@ class Replay:
     def from_file(cls, file):
         """
         Parse an osr file
+
+        Only the header is parsed here, the input frames are decompressed and parsed
+        the first time something that needs them is used
+
+        When file is a path, replays are cached by absolute path, modification time and size,
+        loading the same unchanged file again returns a copy of the cached replay
+        that shares its parsed input frames
+        Anything else open() accepts, such as a file descriptor, is parsed without the cache
         """
+        key = None
+        if isinstance(file, (str, bytes, os.PathLike)):
+            stat = os.stat(file)
+            key = (os.path.abspath(os.fsdecode(file)), stat.st_mtime_ns, stat.st_size)
+            with _REPLAY_CACHE_LOCK:
+                cached = _REPLAY_CACHE.get(key)
+            if cached is not None:
+                return cached.__cached_copy()
+
         with open(file, "rb") as f:
             data = f.read()
 
@@ -163,151 +311,211 @@ class Replay:
 
         replay_data.raw_data = data
 
-        [mode, data] = _get_data_point(data, 1, _from_big_bytes)
+        cur = _Cursor(memoryview(data))
+
+        mode = cur.read_u8()
 
         replay_data.mode = mode
 
         if mode > 4:
             raise BadReplayDataException("Invalid osu replay file")
 
-        [version, data] = _get_data_point(data, 4)
-
-        replay_data.version = version
+        replay_data.version = bytes(cur.read(4))
 
         #apparently if this is null the data is not there
-        if(int(data[0]) ==0x0b):
+        if(cur.buf[cur.off] == 0x0b):
             #offset because of \x0b
-            data = data[1:]
+            cur.off += 1
 
-            [hash_length, data] = _get_data_point(data, 1, _from_small_bytes)
-            [beatmap_hash, data] = _get_data_point(data, hash_length, lambda x: x.decode("utf-8"))
+            hash_length = cur.read_u8()
+            replay_data.beatmap_hash = cur.read_str(hash_length)
 
-            replay_data.beatmap_hash = beatmap_hash
+        else: cur.off += 1
 
-        else: data = data[1:]
-
-        if(int(data[0]) == 0x0b):
+        if(cur.buf[cur.off] == 0x0b):
             #offset because of \x0b
-            data = data[1:]
-            [name_length, data] = _get_data_point(data, 1, _from_small_bytes)
-            [name, data] = _get_data_point(data, name_length, lambda x: x.decode("utf-8"))
-            replay_data.player_name = name
+            cur.off += 1
+            name_length = cur.read_u8()
+            replay_data.player_name = cur.read_str(name_length)
 
-        else: data = data[1:]
+        else: cur.off += 1
 
-        if(int(data[0]) == 0x0b):
+        if(cur.buf[cur.off] == 0x0b):
             #offset because of \x0b
-            data = data[1:]
-            [hash_length, data] = _get_data_point(data, 1, _from_small_bytes)
+            cur.off += 1
+            hash_length = cur.read_u8()
+
+            replay_data.replay_hash = cur.read_str(hash_length)
+
+        else: cur.off += 1
+
+        #every field from the 300 count up to the mods has a fixed width, so they are read in one go
+        (
+            replay_data.count_of_perfect,
+            replay_data.count_of_good,
+            replay_data.count_of_bad,
+            replay_data.gekis,
+            replay_data.katus,
+            replay_data.misses,
+            replay_data.score,
+            replay_data.highest_combo,
+            replay_data.is_perfect,
+            replay_data.mods
+        ) = cur.read_struct(_FIXED_STRUCT)
 
-            [replay_data.replay_hash, data] = _get_data_point(data, hash_length, lambda x: x.decode("utf-8"))
-            
-        else: data = data[1:]
+        #skipping \x0b
+        if(cur.buf[cur.off] == 0x0b):
+            cur.off += 1
 
-        [threehundreds, data] = _get_data_point(data, 2, _from_small_bytes)
-        replay_data.count_of_perfect = threehundreds
+            val, cur.off = _read_uleb128(cur.buf, cur.off)
 
-        [hundreds, data] = _get_data_point(data, 2, _from_small_bytes)
-        replay_data.count_of_good = hundreds
+            chart_data = cur.read_str(val).split(",")
 
-        [fifties, data] = _get_data_point(data, 2, _from_small_bytes)
-        replay_data.count_of_bad = fifties
+            chart_data = (x for x in map(lambda x: x.split("|"), chart_data) if x[0])
 
-        [gekis, data] = _get_data_point(data, 2, _from_small_bytes)
-        replay_data.gekis = gekis
+            chart_data = tuple((int(t), float(l)) for t, l in chart_data)
 
-        [katus, data] = _get_data_point(data, 2, _from_small_bytes)
-        replay_data.katus = katus
+            replay_data.life_graph = LifeGraph(chart_data)
+                
+        else: cur.off += 1
 
-        [misses, data] = _get_data_point(data, 2, _from_small_bytes)
-        replay_data.misses = misses
+        replay_data.time_stamp_ns = cur.read_u64()
 
-        [score, data] = _get_data_point(data, 4, _from_small_bytes)
-        replay_data.score = score
+        replay_data_len = cur.read_u32()
 
-        [biggest_combo, data] = _get_data_point(data, 2, _from_small_bytes)
-        replay_data.highest_combo = biggest_combo
+        replay_data.replay_data = bytearray(cur.read(replay_data_len))
 
-        [perfect, data] = _get_data_point(data, 1, lambda x: bool.from_bytes(x, "little"))
-        replay_data.is_perfect = perfect
+        replay_data.online_score_id = cur.read_u64()
 
-        [mods, data] = _get_data_point(data, 4, _from_small_bytes)
+        if key is None:
+            return replay_data
 
-        replay_data.mods = mods
+        replay_data.__load_lock = threading.Lock()
 
-        #skipping \x0b
-        if(int(data[0]) == 0x0b):
-            data = data[1:]
-
-            val = 0
-            shift = 0
-            i = 0
-            while True:
-                b = data[i]
-                #idk what the heck this does it's horrifying
-                #it's bit wise oring the result of the bitwise and of b and 127, then bitshifting it left
-                val |= (b & 0x7f) << shift
-                #doesn't this checks if b contains the highest bit in the binary number 128
-                if (b & 0x80) == 0:
-                    break
-                #shift over by a bit for each bit that has been read?
-                shift += 7
-                i += 1
-            data = data[i + 1:]
-
-            chart = data[0:val]
-
-            chart_data = chart.decode("utf-8").split(",")
+        with _REPLAY_CACHE_LOCK:
+            if key not in _REPLAY_CACHE and len(_REPLAY_CACHE) >= _REPLAY_CACHE_SIZE:
+                #dicts keep insertion order, so this drops the oldest replay
+                del _REPLAY_CACHE[next(iter(_REPLAY_CACHE))]
+            _REPLAY_CACHE[key] = replay_data
 
-            chart_data = (x for x in map(lambda x: x.split("|"), chart_data) if x[0])
+        return replay_data.__cached_copy()
 
-            chart_data = tuple((int(t), float(l)) for t, l in chart_data)
-            #
-            data = data[val:]
+    def __cached_copy(self) -> "Replay":
+        replay = copy(self)
+        replay.__load_lock = None
+        #once the cached replay has its input frames the copy already shares them through copy()
+        #and has no reason to keep the cached replay alive or pickle it along
+        replay.__source = self if self._b is None else None
+        #the mutable attributes are copied so changing them does not change the cached replay
+        if self.replay_data is not None:
+            replay.replay_data = bytearray(self.replay_data)
+        if self.life_graph is not None:
+            replay.life_graph = LifeGraph(self.life_graph.data)
+        return replay
 
-            replay_data.life_graph = LifeGraph(chart_data)
-                
-        else: data = data[1:]
+    @classmethod
+    def from_files(cls, files, workers: int | None = None, use_threads: bool = False) -> list["Replay"]:
+        """
+        Parse many osr files in parallel, returned in the same order as files
 
-        [replay_data.time_stamp_ns, data] = _get_data_point(data, 8, _from_small_bytes)
+        Unlike from_file, the input frames are decompressed and parsed in the workers too
+        Uses a process pool by default, lzma releases the GIL while decompressing
+        so use_threads=True also works, and avoids copying every replay back from another process
+        """
+        executor = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+        with executor(workers) as ex:
+            return list(ex.map(cls._from_file_with_inputs, files))
 
-        [replay_data_len, data] = _get_data_point(data, 4, _from_small_bytes)
+    @classmethod
+    def _from_file_with_inputs(cls, file):
+        replay = cls.from_file(file)
+        replay.__load_actions()
+        return replay
 
-        [replay_data.replay_data, data] = _get_data_point(data, replay_data_len, bytearray)
+    @staticmethod
+    def clear_cache():
+        """
+        Forgets every replay cached by from_file
 
-        [replay_data.online_score_id, data] = _get_data_point(data, 8, _from_small_bytes)
-        with open("file.lzma", "wb") as f:
-            f.write(replay_data.replay_data)
+        The cache holds up to 128 replays along with their raw file data and parsed input frames,
+        call this to release that memory after loading many large replays
+        """
+        with _REPLAY_CACHE_LOCK:
+            _REPLAY_CACHE.clear()
 
-        player_inputs = lzma.open("file.lzma").read().decode("utf-8")
+    def __load_actions(self) -> bool:
+        """
+        Decompresses and parses the input frames if that has not been done yet
 
-        groups = []
-        for n in player_inputs.split(","):
-            if not n: continue
-            [ts, x, y, b] = n.split("|")
-            ts = int(ts)
-            x = float(x)
-            y = float(y)
-            b = int(b)
-            groups.append((ts, x, y, b))
+        Returns False if there are no input frames
+        """
+        if self._b is not None:
+            return True
+
+        source = self.__source
+        if source is not None:
+            #dropped so a pickled copy does not carry the cached replay along with it
+            self.__source = None
+            with source.__load_lock:
+                if not source.__load_actions():
+                    return False
+            self._ts = source._ts
+            self._x = source._x
+            self._y = source._y
+            self.__seed = source.__seed
+            self.__total_x = source.__total_x
+            self.__total_y = source.__total_y
+            #set last, other methods take a non None _b to mean everything above is ready
+            self._b = source._b
+            return True
+
+        if self.replay_data is None:
+            return False
+
+        ts, x, y, b = _parse_action_stream(lzma.decompress(self.replay_data))
+
+        if ts and ts[-1] == -12345:
+            self.__seed = b.pop()
+            del ts[-1], x[-1], y[-1]
+
+        self._ts = ts
+        self._x = x
+        self._y = y
+        #summed while the columns are fresh so average_position does not need another pass
+        self.__total_x = sum(x)
+        self.__total_y = sum(y)
+        #set last, other methods take a non None _b to mean everything above is ready
+        self._b = b
+        return True
 
-        if groups[-1][0] == -12345:
-            replay_data.seed = groups[-1][3]
-            groups = groups[:-1]
+    @property
+    def seed(self):
+        """
+        The rng seed stored at the end of the input frames, None if there is not one
+        """
+        self.__load_actions()
+        return self.__seed
 
-        replay_data.raw_input_data = tuple(groups)
-        return replay_data
+    @property
+    def raw_input_data(self) -> tuple | None:
+        """
+        The input frames as a tuple of (time since last frame, x, y, buttons)
+
+        Built from the parsed columns the first time it is accessed
+        """
+        if self.__raw_input_data is None and self.__load_actions():
+            self.__raw_input_data = tuple(zip(self._ts, self._x, self._y, self._b))
+        return self.__raw_input_data
 
     def estimated_frame_rate(self) -> float:
         """
         calculates the frame rate based on the most common time between inputs
         assuming the player is holding down keys for more than 1 frame this should be somewhat accurate
         """
-        if self.raw_input_data is None:
+        if not self.__load_actions() or not self._ts:
             return nan
-        delays = map(lambda x: x[0], self.raw_input_data)
-        mode_delay = mode(delays)
-        return  1000 / 1 / mode_delay
+        [(mode_delay, _)] = Counter(self._ts).most_common(1)
+        return 1000 / mode_delay
 
     def click_count(self) -> tuple[int, int, int, int]:
         """
@@ -315,38 +523,50 @@ class Replay:
 
         Returns -1 if it can not be calculated
         """
-        if self.__mouse_left_frames is not None \
-                and self.__mouse_right_frames is not None \
-                and self.__k1_frames is not None \
-                and self.__k2_frames is not None:
-            return (self.__mouse_right_frames, self.__mouse_right_frames, self.__k1_frames, self.__k2_frames)
-
-        if self.raw_input_data is None:
+        if not self.__load_actions():
             return (-1, -1, -1, -1)
 
-        mouse_left = sum(map(lambda x: 1 if x[-1] & self.MOUSE_LEFT else 0, self.raw_input_data))
-        mouse_right = sum(map(lambda x: 1 if x[-1] & self.MOUSE_RIGHT else 0, self.raw_input_data))
-        k_1 = sum(map(lambda x: 1 if x[-1] & self.K1 else 0, self.raw_input_data))
-        k_2 = sum(map(lambda x: 1 if x[-1] & self.K2 else 0, self.raw_input_data))
+        return (self.mouse_left_frames, self.mouse_right_frames, self.k1_frames, self.k2_frames)
+
+    def _mask_hist(self) -> list[int] | None:
+        """
+        Counts how many frames had each combination of the 4 button bits
+
+        Calculated once, every frame count is derived from this
+        """
+        if self.__mask_hist is None:
+            mask_bytes = self._mask_bytes()
+            if mask_bytes is None:
+                return None
+            nibbles = mask_bytes.translate(_LOW_NIBBLE)
+            self.__mask_hist = [nibbles.count(i) for i in range(16)]
+        return self.__mask_hist
+
+    def _mask_bytes(self) -> bytes | None:
+        """
+        The low byte of the buttons of every frame, packed into one bytes object
 
-        self.__mouse_left_frames = mouse_left - k_1
-        self.__mouse_right_frames = mouse_right - k_2
-        self.__k1_frames = k_1
-        self.__k2_frames = k_2
-        return (mouse_left - k_1, mouse_right - k_2, k_1, k_2)
+        Built once, so per key scans only need C level bytes operations
+        """
+        if self.__mask_bytes is None and self.__load_actions():
+            self.__mask_bytes = bytes(map(0xFF.__and__, self._b))
+        return self.__mask_bytes
+
+    def _frames_with_mask(self, mask: int) -> int:
+        """
+        Counts the frames where any of the buttons in mask were held down
+
+        Returns -1 if it can not be calculated
+        """
+        hist = self._mask_hist()
+        if hist is None:
+            return -1
+        return sum(count for buttons, count in enumerate(hist) if buttons & mask)
 
     def __true_count_of(self, key: int):
-        if self.raw_input_data is None:
+        if not self.__load_actions():
             return -1
-        count = 0
-        key_is_up = True
-        for data_point in self.raw_input_data:
-            if data_point[-1] & key and key_is_up is False:
-                key_is_up = True
-            elif not data_point[-1] & key and key_is_up:
-                count += 1
-                key_is_up = False
-        return count
+        return _count_edges(self._mask_bytes(), key)
 
     def true_click_count(self) -> tuple[int, int, int, int]:
         """
@@ -360,7 +580,7 @@ class Replay:
                 and self.__k1 is not None \
                 and self.__k2 is not None:
             return (self.__mouse_left, self.__mouse_right, self.__k1, self.__k2)
-        if self.raw_input_data is None:
+        if not self.__load_actions():
             return (-1, -1, -1, -1)
 
         mouse_left = self.__true_count_of(self.MOUSE_LEFT)
@@ -386,6 +606,9 @@ class Replay:
 
         Returns -1 if it can not be calculated
         """
+        if not self.__load_actions():
+            return -1
+
         if self.__mouse_left is None:
             self.__k1 = self.__true_count_of(self.K1)
             self.__mouse_left = self.__true_count_of(self.MOUSE_LEFT) - self.__k1
@@ -405,6 +628,9 @@ class Replay:
         Returns -1 if it can not be calculated
         """
 
+        if not self.__load_actions():
+            return -1
+
         if self.__mouse_right is None:
             self.__k2 = self.__true_count_of(self.K2)
             self.__mouse_right = self.__true_count_of(self.MOUSE_RIGHT) - self.__k2
@@ -454,11 +680,11 @@ class Replay:
 
         Returns -1 if it can not be calculated
         """
-        if self.raw_input_data is None:
+        if not self.__load_actions():
             return -1
 
         if self.__k1_frames is None:
-            return sum(map(lambda x: 1 if x[-1] & self.K1 else 0, self.raw_input_data))
+            self.__k1_frames = self._frames_with_mask(self.K1)
 
         return self.__k1_frames
 
@@ -471,13 +697,13 @@ class Replay:
 
         Returns -1 if it can not be calculated
         """
-        if self.raw_input_data is None:
+        if not self.__load_actions():
             return -1
 
         if self.__mouse_left_frames is None:
             if self.__k1_frames is None:
                 self.__k1_frames = self.k1_frames
-            self.__mouse_left_frames =  sum(map(lambda x: 1 if x[-1] & self.MOUSE_LEFT else 0, self.raw_input_data)) - self.__k1_frames
+            self.__mouse_left_frames =  self._frames_with_mask(self.MOUSE_LEFT) - self.__k1_frames
 
         return self.__mouse_left_frames
 
@@ -491,12 +717,12 @@ class Replay:
         Returns -1 if it can not be calculated
         """
 
-        if self.raw_input_data is None:
+        if not self.__load_actions():
             return -1
-        if self.__k1_frames is None:
-            return sum(map(lambda x: 1 if x[-1] & self.K1 else 0, self.raw_input_data))
+        if self.__k2_frames is None:
+            self.__k2_frames = self._frames_with_mask(self.K2)
 
-        return self.__k1_frames
+        return self.__k2_frames
 
     @property
     def mouse_right_frames(self) -> int:
@@ -508,13 +734,13 @@ class Replay:
         Returns -1 if it can not be calculated
         """
 
-        if self.raw_input_data is None:
+        if not self.__load_actions():
             return -1
 
         if self.__mouse_right_frames is None:
             if self.__k2_frames is None:
                 self.__k2_frames = self.k2_frames
-            self.__mouse_right_frames =  sum(map(lambda x: 1 if x[-1] & self.MOUSE_RIGHT else 0, self.raw_input_data)) - self.__k2_frames
+            self.__mouse_right_frames =  self._frames_with_mask(self.MOUSE_RIGHT) - self.__k2_frames
 
         return self.__mouse_right_frames
 
@@ -538,7 +764,7 @@ class Replay:
     def __getitem__(self, item):
         if self.raw_input_data is None:
             return None
-        if isinstance(item, slice | int):
+        if isinstance(item, (slice, int)):
             return self.raw_input_data[item]
         elif isinstance(item, tuple):
             return tuple(self[point] for point in item)
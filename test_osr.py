@@ -0,0 +1,147 @@
+import lzma
+import os
+import struct
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import osr
+
+#button states of every frame: left click + k1, right click + k2, and right click on its own
+BUTTONS = (0, 5, 5, 0, 10, 10, 10, 0, 2, 0)
+
+def _string(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return b"\x0b" + bytes((len(encoded),)) + encoded
+
+def _make_osr(buttons=BUTTONS, seed=42) -> bytes:
+    frames = [f"16|{i * 10}.5|{i * 5}.25|{b}" for i, b in enumerate(buttons)]
+    frames.append(f"-12345|0|0|{seed}")
+    actions = lzma.compress((",".join(frames) + ",").encode("utf-8"), format=lzma.FORMAT_ALONE)
+    life_graph = "0|1,1000|0.5,"
+
+    data = b"\x00" + struct.pack("<I", 20240101)
+    data += _string("a" * 32) + _string("player") + _string("b" * 32)
+    data += struct.pack("<HHHHHHIH?I", 300, 20, 3, 40, 5, 2, 1234567, 456, False, 72)
+    data += _string(life_graph)
+    data += struct.pack("<qI", 638000000000000000, len(actions)) + actions
+    data += struct.pack("<q", 987654321)
+    return data
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        osr.Replay.clear_cache()
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "replay.osr")
+        with open(self.path, "wb") as f:
+            f.write(_make_osr())
+
+    def tearDown(self):
+        osr.Replay.clear_cache()
+        self.dir.cleanup()
+
+    def test_header(self):
+        replay = osr.Replay.from_file(self.path)
+        self.assertEqual(replay.mode, 0)
+        self.assertEqual(replay.player_name, "player")
+        self.assertEqual(replay.beatmap_hash, "a" * 32)
+        self.assertEqual(replay.count_of_perfect, 300)
+        self.assertEqual(replay.score, 1234567)
+        self.assertEqual(replay.highest_combo, 456)
+        self.assertIs(replay.is_perfect, False)
+        self.assertEqual(replay.mods, 72)
+        self.assertEqual(replay.online_score_id, 987654321)
+        self.assertEqual(replay.life_graph[-1], (1000, 0.5))
+
+    def test_input_frames(self):
+        replay = osr.Replay.from_file(self.path)
+        self.assertEqual(replay.seed, 42)
+        self.assertEqual(len(replay.raw_input_data), len(BUTTONS))
+        self.assertEqual(replay[1], (16, 10.5, 5.25, 5))
+        self.assertEqual(replay.average_position(), (45.5, 22.75))
+        self.assertEqual(replay.estimated_frame_rate(), 1000 / 16)
+
+    def test_k2_frames_counts_k2(self):
+        replay = osr.Replay.from_file(self.path)
+        self.assertEqual(replay.k1_frames, 2)
+        self.assertEqual(replay.k2_frames, 3)
+
+    def test_mouse_right_frames(self):
+        replay = osr.Replay.from_file(self.path)
+        self.assertEqual(replay.mouse_left_frames, 0)
+        self.assertEqual(replay.mouse_right_frames, 1)
+
+    def test_click_count_repeated(self):
+        replay = osr.Replay.from_file(self.path)
+        self.assertEqual(replay.click_count(), (0, 1, 2, 3))
+        self.assertEqual(replay.click_count(), (0, 1, 2, 3))
+
+    def test_true_click_count(self):
+        replay = osr.Replay.from_file(self.path)
+        self.assertEqual(replay.true_click_count(), (0, 1, 2, 2))
+
+    def test_no_input_frames(self):
+        replay = osr.Replay()
+        self.assertEqual(replay.click_count(), (-1, -1, -1, -1))
+        self.assertEqual(replay.true_click_count(), (-1, -1, -1, -1))
+        self.assertEqual(replay.mouse_left, -1)
+        self.assertEqual(replay.mouse_right, -1)
+        self.assertEqual(replay.k2_frames, -1)
+
+    def test_header_does_not_decompress(self):
+        with mock.patch("osr.lzma.decompress", wraps=lzma.decompress) as decompress:
+            replay = osr.Replay.from_file(self.path)
+            self.assertEqual(replay.player_name, "player")
+            decompress.assert_not_called()
+            self.assertEqual(replay.k2_frames, 3)
+            decompress.assert_called_once()
+
+    def test_cached_copies_share_input_frames(self):
+        with mock.patch("osr.lzma.decompress", wraps=lzma.decompress) as decompress:
+            first = osr.Replay.from_file(self.path)
+            second = osr.Replay.from_file(self.path)
+            self.assertIsNot(first, second)
+            self.assertEqual(first.click_count(), (0, 1, 2, 3))
+            self.assertEqual(second.click_count(), (0, 1, 2, 3))
+            decompress.assert_called_once()
+
+    def test_cached_copies_are_independent(self):
+        first = osr.Replay.from_file(self.path)
+        first.replay_data[0] ^= 0xFF
+        first.life_graph.data = ()
+        second = osr.Replay.from_file(self.path)
+        self.assertEqual(second.k2_frames, 3)
+        self.assertEqual(len(second.life_graph.data), 2)
+
+    def test_file_descriptor(self):
+        fd = os.open(self.path, os.O_RDONLY)
+        replay = osr.Replay.from_file(fd)
+        self.assertEqual(replay.player_name, "player")
+        self.assertEqual(replay.k2_frames, 3)
+
+    def test_malformed_frame(self):
+        with self.assertRaises(osr.BadReplayDataException):
+            osr._parse_action_stream(b"1|2|3,4|5|6|7|8,")
+
+    def test_from_files(self):
+        replays = osr.Replay.from_files([self.path, self.path], workers=2)
+        self.assertEqual([replay.click_count() for replay in replays], [(0, 1, 2, 3)] * 2)
+
+    def test_from_files_threads_duplicate_paths(self):
+        #a slow decompress keeps every thread inside the first load of the shared cached replay at the same time
+        decompress = lzma.decompress
+
+        def slow_decompress(data):
+            time.sleep(0.05)
+            return decompress(data)
+
+        with mock.patch("osr.lzma.decompress", side_effect=slow_decompress) as patched:
+            replays = osr.Replay.from_files([self.path] * 8, workers=8, use_threads=True)
+            patched.assert_called_once()
+        self.assertEqual([replay.average_position() for replay in replays], [(45.5, 22.75)] * 8)
+        self.assertEqual([replay.click_count() for replay in replays], [(0, 1, 2, 3)] * 8)
+        self.assertEqual([replay.seed for replay in replays], [42] * 8)
+
+if __name__ == '__main__':
+    unittest.main()